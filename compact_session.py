@@ -0,0 +1,409 @@
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from dictionary_handler import dictionary_fingerprint, is_word_valid
+from endgame_solver import ALPHABET, DIRECTIONS
+from game_logic import BaldaGame
+from update_stream import UpdateStream
+
+# Постоянная таблица букв: на поле хранится код буквы (0 - пустая клетка, дальше - ALPHABET).
+# Она не зависит от процесса, поэтому сохраненную партию можно прочитать после перезапуска
+_LETTERS = ' ' + ALPHABET
+_LETTER_CODES = {letter: code for code, letter in enumerate(_LETTERS)}
+
+# Общий индекс слов последнего словаря: (словарь, отсортированный кортеж слов, отпечаток словаря).
+# Сервер играет одним словарем, поэтому хранится одна запись и прежние словари не удерживаются
+_word_index = None
+
+# Версия формата сохраненной партии (меняется при любом изменении формата)
+PARKED_FORMAT_VERSION = 1
+# Заголовок сохраненной партии: версия формата, отпечаток словаря (номера слов имеют смысл
+# только для того же словаря), размер поля, чей ход, число слов, очки игроков
+_PARKED_HEADER = struct.Struct("<B8sBBHii")
+
+
+def letter_code(letter):
+    """Возвращает код буквы в постоянной таблице (ValueError для буквы вне алфавита)."""
+    code = _LETTER_CODES.get(letter)
+    if code is None:
+        raise ValueError(f"Буква '{letter}' не входит в алфавит компактного поля.")
+    return code
+
+
+def _get_index_entry(dictionary):
+    global _word_index
+    entry = _word_index
+    if entry is None or entry[0] is not dictionary:
+        words = tuple(sorted(dictionary))
+        entry = (dictionary, words, bytes.fromhex(dictionary_fingerprint(words))[:8])
+        _word_index = entry
+    return entry
+
+
+def get_word_index(dictionary):
+    """
+    Возвращает общий для всех партий отсортированный кортеж слов словаря.
+    Номер слова в нем служит идентификатором слова в компактной партии.
+    """
+    return _get_index_entry(dictionary)[1]
+
+
+def word_id(word_index, word):
+    """Возвращает номер слова в индексе (ValueError, если слова нет в словаре)."""
+    position = bisect_left(word_index, word)
+    if position == len(word_index) or word_index[position] != word:
+        raise ValueError(f"Слово '{word}' отсутствует в словаре партии.")
+    return position
+
+
+class CompactSession:
+    """
+    Компактное представление партии для сервера с большим числом игр.
+    Поле хранится в bytearray кодами букв, очки - в array, использованные
+    слова - номерами в общем индексе словаря, имена игроков интернированы.
+    Словарь не копируется: все партии ссылаются на один и тот же объект.
+    Ходы делаются прямо в компактном представлении (make_move); поток
+    изменений для зрителей (updates) создается, только пока есть подписчики.
+    """
+
+    __slots__ = ('board_size', 'board', 'scores', 'names', 'used_word_ids', 'current_player_id',
+                 'dictionary', 'last_active', 'updates')
+
+    def __init__(self, board_size, board, scores, names, used_word_ids, current_player_id, dictionary):
+        self.board_size = board_size
+        self.board = board
+        self.scores = scores
+        self.names = names
+        self.used_word_ids = used_word_ids
+        self.current_player_id = current_player_id
+        self.dictionary = dictionary
+        self.last_active = time.monotonic()
+        self.updates = None  # UpdateStream, пока на партию есть подписчики
+
+    @classmethod
+    def from_game(cls, game):
+        """Создает компактную партию из BaldaGame."""
+        word_index = get_word_index(game.dictionary)
+        board = bytearray(letter_code(char) for row in game.board for char in row)
+        scores = array('i', [game.players[1]['score'], game.players[2]['score']])
+        names = (sys.intern(game.players[1]['name']), sys.intern(game.players[2]['name']))
+        used_word_ids = array('I', sorted(word_id(word_index, word) for word in game.used_words))
+        return cls(game.board_size, board, scores, names, used_word_ids, game.current_player_id, game.dictionary)
+
+    def to_game(self):
+        """Восстанавливает полноценную BaldaGame (словарь общий, не перезагружается)."""
+        word_index = get_word_index(self.dictionary)
+        game = BaldaGame(board_size=self.board_size, initial_word="", dictionary=self.dictionary)
+        size = self.board_size
+        game.board = [[_LETTERS[code] for code in self.board[r * size:(r + 1) * size]] for r in range(size)]
+        game.used_words = {word_index[index] for index in self.used_word_ids}
+        for player_id in (1, 2):
+            game.players[player_id]['score'] = self.scores[player_id - 1]
+            game.players[player_id]['name'] = self.names[player_id - 1]
+        game.current_player_id = self.current_player_id
+        return game
+
+    def make_move(self, row, col, letter, word_coords):
+        """
+        Делает ход по тем же правилам, что BaldaGame.make_move, не создавая BaldaGame,
+        и при успехе передает ход другому игроку. Возвращает (успех, сообщение).
+        """
+        letter = letter.upper()
+        word, message = self._check_move(row, col, letter, word_coords)
+        if word is None:
+            return False, message
+
+        next_player_id = 1 if self.current_player_id == 2 else 2
+        if self.updates is None:
+            self._apply_move(row, col, letter, word)
+        else:
+            update = {'type': 'move',
+                      'player_id': self.current_player_id,
+                      'row': row,
+                      'col': col,
+                      'letter': letter,
+                      'word': word,
+                      'path': list(word_coords),
+                      'score_delta': len(word),
+                      'next_player_id': next_player_id}
+            self.updates.commit(lambda: self._apply_move(row, col, letter, word), update)
+        return True, message
+
+    def _check_move(self, row, col, letter, word_coords):
+        """Проверяет ход. Возвращает (слово, сообщение об успехе) или (None, сообщение об ошибке)."""
+        size = self.board_size
+        if not (0 <= row < size and 0 <= col < size):
+            return None, "Координаты вне поля."
+        if self.board[row * size + col] != 0:
+            return None, "Ячейка уже занята."
+        if not letter.isalpha() or len(letter) != 1:
+            return None, "Нужна одна буква."
+        if letter not in _LETTER_CODES:
+            return None, f"Буква '{letter}' не входит в алфавит игры."
+        if not any(0 <= row + dr < size and 0 <= col + dc < size and self.board[(row + dr) * size + col + dc] != 0
+                   for dr, dc in DIRECTIONS):
+            return None, "Новая буква должна примыкать к существующим."
+
+        # Слово: клетки по соседству друг с другом, без повторов, все заняты (с учетом новой буквы)
+        chars = []
+        for i, (r, c) in enumerate(word_coords):
+            if not (0 <= r < size and 0 <= c < size) or (r, c) in word_coords[:i]:
+                return None, "Составленное слово должно быть непрерывным на поле."
+            if i and abs(r - word_coords[i - 1][0]) + abs(c - word_coords[i - 1][1]) != 1:
+                return None, "Составленное слово должно быть непрерывным на поле."
+            char = letter if (r, c) == (row, col) else _LETTERS[self.board[r * size + c]]
+            if char == ' ':
+                return None, "Составленное слово должно быть непрерывным на поле."
+            chars.append(char)
+        word = "".join(chars)
+        if not word:
+            return None, "Составленное слово должно быть непрерывным на поле."
+
+        if not is_word_valid(word, self.dictionary):
+            return None, f"Слово '{word}' не найдено в словаре или слишком короткое."
+        word_index = get_word_index(self.dictionary)
+        position = bisect_left(self.used_word_ids, word_id(word_index, word))
+        if position < len(self.used_word_ids) and word_index[self.used_word_ids[position]] == word:
+            return None, f"Слово '{word}' уже использовано."
+        if (row, col) not in word_coords:
+            return None, "Новая буква должна быть частью составленного слова."
+        return word, f"Отлично! Слово '{word}' (очки: {len(word)}) добавлено."
+
+    def _apply_move(self, row, col, letter, word):
+        """Применяет проверенный ход и передает ход другому игроку."""
+        self.board[row * self.board_size + col] = _LETTER_CODES[letter]
+        insort(self.used_word_ids, word_id(get_word_index(self.dictionary), word))
+        self.scores[self.current_player_id - 1] += len(word)
+        self.current_player_id = 1 if self.current_player_id == 2 else 2
+
+    def get_snapshot(self):
+        """Снимок партии в том же виде, что BaldaGame.get_snapshot."""
+        size = self.board_size
+        word_index = get_word_index(self.dictionary)
+        return {'board_size': size,
+                'board': ["".join(_LETTERS[code] for code in self.board[r * size:(r + 1) * size])
+                          for r in range(size)],
+                'used_words': sorted(word_index[index] for index in self.used_word_ids),
+                'players': {player_id: {'name': self.names[player_id - 1], 'score': self.scores[player_id - 1]}
+                            for player_id in (1, 2)},
+                'current_player_id': self.current_player_id}
+
+    def park(self):
+        """Сериализует партию в bytes для хранения простаивающей игры."""
+        fingerprint = _get_index_entry(self.dictionary)[2]
+        header = _PARKED_HEADER.pack(PARKED_FORMAT_VERSION, fingerprint, self.board_size, self.current_player_id,
+                                     len(self.used_word_ids), self.scores[0], self.scores[1])
+        names = "\0".join(self.names).encode('utf-8')
+        return header + bytes(self.board) + self.used_word_ids.tobytes() + names
+
+    @classmethod
+    def unpark(cls, blob, dictionary):
+        """
+        Восстанавливает партию из результата park().
+        Выбрасывает ValueError, если партия сохранена в другом формате или для другого словаря.
+        """
+        version, fingerprint, board_size, current_player_id, used_count, score_1, score_2 = \
+            _PARKED_HEADER.unpack_from(blob)
+        if version != PARKED_FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата сохраненной партии: {version}.")
+        if fingerprint != _get_index_entry(dictionary)[2]:
+            raise ValueError("Партия сохранена для другого словаря.")
+        offset = _PARKED_HEADER.size
+        board = bytearray(blob[offset:offset + board_size * board_size])
+        offset += board_size * board_size
+        used_word_ids = array('I')
+        used_word_ids.frombytes(blob[offset:offset + used_count * used_word_ids.itemsize])
+        offset += used_count * used_word_ids.itemsize
+        names = tuple(sys.intern(name) for name in blob[offset:].decode('utf-8').split("\0"))
+        return cls(board_size, board, array('i', [score_1, score_2]), names, used_word_ids, current_player_id,
+                   dictionary)
+
+
+class SessionStore:
+    """
+    Хранилище множества партий одного сервера.
+    Активные партии хранятся как CompactSession, простаивающие дольше
+    idle_seconds (park_idle) - как bytes. Сохраненная партия оживает
+    при следующем обращении к ней. Партии, на которые подписаны зрители,
+    не сохраняются. Ходы и подписки выполняются под блокировкой хранилища.
+    """
+
+    def __init__(self, dictionary, idle_seconds=300):
+        self.dictionary = dictionary
+        self.idle_seconds = idle_seconds
+        self.sessions = {}  # номер партии -> CompactSession или bytes
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add(self, game):
+        """Добавляет партию и возвращает ее номер."""
+        session_id = self._next_id
+        self._next_id += 1
+        self.sessions[session_id] = CompactSession.from_game(game)
+        return session_id
+
+    def get_session(self, session_id):
+        """Возвращает CompactSession, оживляя сохраненную партию при необходимости."""
+        session = self.sessions[session_id]
+        if isinstance(session, bytes):
+            session = CompactSession.unpark(session, self.dictionary)
+            self.sessions[session_id] = session
+        session.last_active = time.monotonic()
+        return session
+
+    def get_game(self, session_id):
+        """Возвращает копию партии в виде BaldaGame (например, для отображения)."""
+        return self.get_session(session_id).to_game()
+
+    def make_move(self, session_id, row, col, letter, word_coords):
+        """
+        Делает ход в партии, как BaldaGame.make_move, и при успехе
+        передает ход другому игроку. Возвращает (успех, сообщение).
+        """
+        with self._lock:
+            return self.get_session(session_id).make_move(row, col, letter, word_coords)
+
+    def subscribe(self, session_id, max_queue=100):
+        """Подписывает зрителя на изменения партии (как BaldaGame.subscribe)."""
+        with self._lock:
+            session = self.get_session(session_id)
+            if session.updates is None:
+                session.updates = UpdateStream(session.get_snapshot)
+            return session.updates.subscribe(max_queue)
+
+    def unsubscribe(self, session_id, subscription):
+        """Отписывает зрителя. Поток изменений партии удаляется вместе с последним подписчиком."""
+        with self._lock:
+            session = self.sessions[session_id]
+            if isinstance(session, bytes) or session.updates is None:
+                return
+            session.updates.unsubscribe(subscription)
+            if len(session.updates) == 0:
+                session.updates = None
+
+    def park_idle(self, now=None):
+        """Сохраняет в bytes партии, простаивающие дольше idle_seconds. Возвращает их количество."""
+        if now is None:
+            now = time.monotonic()
+        parked = 0
+        for session_id, session in self.sessions.items():
+            if not isinstance(session, bytes) and session.updates is None \
+                    and now - session.last_active >= self.idle_seconds:
+                self.sessions[session_id] = session.park()
+                parked += 1
+        return parked
+
+
+def measure_memory(dictionary, count=1000, moves=4, seed=0):
+    """
+    Измеряет память на одну партию: BaldaGame, CompactSession и сохраненную (bytes).
+    Словарь общий для всех партий и в замер не входит.
+    Возвращает словарь с числом байт на партию для каждого представления.
+    """
+    import random
+    import tracemalloc
+    from endgame_solver import build_prefixes, find_moves
+
+    # Несколько ходов, чтобы партии были не пустыми
+    random.seed(seed)
+    prefixes = build_prefixes(dictionary)
+    template = BaldaGame(dictionary=dictionary)
+    for _ in range(moves):
+        game_moves = find_moves(template.board, dictionary, prefixes, template.used_words)
+        if not game_moves:
+            break
+        r, c, letter, path, _ = random.choice(game_moves)
+        template.make_move(r, c, letter, path)
+        template.switch_player()
+    template_session = CompactSession.from_game(template)
+    get_word_index(dictionary)  # Общий индекс строится один раз и в замер не входит
+
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [build() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        return (after - before) / count
+
+    return {'game': measure(template_session.to_game),
+            'resident': measure(lambda: CompactSession.from_game(template)),
+            'parked': measure(template_session.park)}
+
+
+if __name__ == "__main__":
+    import queue
+    from dictionary_handler import load_dictionary
+    from update_stream import apply_update
+
+    print("--- Тестирование Compact Session ---")
+
+    test_dictionary = {"БАЛДА", "ФАЛДА", "ЛАДА", "БАЛЛ"}
+    game = BaldaGame(board_size=5, initial_word="БАЛДА", dictionary=test_dictionary)
+    game.players[1]['name'] = "Аня"
+    store = SessionStore(test_dictionary, idle_seconds=0)
+    session_id = store.add(game)
+
+    move_successful, message = store.make_move(session_id, 1, 1, 'Ф', [(1, 1), (2, 1), (2, 2), (2, 3), (2, 4)])
+    print(message)
+    assert move_successful
+
+    assert store.park_idle() == 1
+    assert isinstance(store.sessions[session_id], bytes)
+    revived = store.get_game(session_id)
+    assert revived.board[1][1] == 'Ф' and revived.used_words == {"ФАЛДА"}
+    assert revived.players[1] == {'score': 5, 'name': "Аня"} and revived.current_player_id == 2
+
+    # Ход в компактной партии - по тем же правилам и с теми же сообщениями, что в BaldaGame;
+    # зритель партии получает изменения, а партия со зрителями не сохраняется
+    spectator = store.subscribe(session_id)
+    test_moves = [
+        (1, 2, 'Л', [(2, 0), (2, 1), (2, 2), (1, 2)]),  # БАЛЛ
+        (1, 2, 'А', [(1, 2), (2, 2)]),  # Ячейка занята
+        (0, 0, 'А', [(0, 0)]),  # Не примыкает
+        (3, 2, 'Ь', [(2, 3), (2, 4), (3, 2)]),  # Не непрерывно
+        (3, 1, 'Б', [(3, 1), (2, 1), (2, 2)]),  # Нет в словаре
+        (3, 0, 'Ф', [(3, 0), (2, 0), (2, 1)]),  # Нет в словаре
+    ]
+    for row, col, letter, word_coords in test_moves:
+        expected = revived.make_move(row, col, letter, word_coords)
+        if expected[0]:
+            revived.switch_player()
+        assert store.make_move(session_id, row, col, letter, word_coords) == expected, expected
+    assert store.get_session(session_id).get_snapshot() == revived.get_snapshot()
+    assert store.park_idle() == 0
+
+    state = None
+    while True:
+        try:
+            state = apply_update(state, spectator.get_nowait())
+        except queue.Empty:
+            break
+    assert state['players'] == revived.get_snapshot()['players'] and state['current_player_id'] == 1
+    store.unsubscribe(session_id, spectator)
+    assert store.park_idle() == 1
+
+    # Сохраненная партия не оживает с другим словарем
+    try:
+        CompactSession.unpark(store.sessions[session_id], test_dictionary | {"ЛАДЬЯ"})
+        raise AssertionError("Партия другого словаря должна отвергаться")
+    except ValueError as error:
+        print(error)
+
+    # Слово не из словаря не может стать номером другого слова
+    game.used_words.add("БАЛ")
+    try:
+        CompactSession.from_game(game)
+        raise AssertionError("Слово не из словаря должно отвергаться")
+    except ValueError as error:
+        print(error)
+
+    sizes = measure_memory(load_dictionary(verbose=False), count=1000)
+    print(f"Байт на партию: BaldaGame {sizes['game']:.0f}, "
+          f"CompactSession {sizes['resident']:.0f}, сохраненная {sizes['parked']:.0f}")
+    print("Тестирование Compact Session завершено.")
@@ -1,17 +1,52 @@
 import random
 import os
+import threading
+
+from endgame_solver import EndgameSolver, count_empty_cells, find_moves, other_player, position_key
 
 
 class ComputerPlayer:
-    def __init__(self, game_instance):
+    def __init__(self, game_instance, endgame_threshold=3, endgame_node_budget=20000, endgame_time_limit=5.0,
+                 cache=None, search_depth=2):
         self.game = game_instance
         self.min_word_length = 3  # Минимальная длина слова для поиска
+        # Когда пустых клеток не больше порога, ход ищется точным перебором до конца игры.
+        # На словаре игры при 3 пустых клетках перебор завершается за доли секунды, при 4 -
+        # за 1-5 секунд и иногда упирается в endgame_time_limit. Тогда (и при пороге выше)
+        # результат не точный: это лучший ход последней досчитанной глубины
+        self.endgame_threshold = endgame_threshold
+        self.endgame_node_budget = endgame_node_budget
+        self.endgame_time_limit = endgame_time_limit
+        self.endgame_solver = None  # Создается при первом эндшпиле
+        # Необязательный постоянный кеш анализа (PositionCache). Если он задан,
+        # ходы в середине игры тоже ищутся перебором на глубину search_depth и сохраняются
+        self.cache = cache
+        self.search_depth = search_depth
+        self._cache_checked = False
+        # Обдумывание на ходу соперника: фоновый поток и найденные им ответы
+        self._ponder_thread = None
+        self._ponder_stop = None
+        self._ponder_position = None
+        self.pondered = {}  # ключ позиции -> результат анализа
+        self.ponder_stats = {'hits': 0, 'misses': 0}
 
     def make_computer_move(self):
         """
         Очень простой ИИ: ищет первое возможное место для буквы
         и пытается составить любое допустимое слово.
+        В эндшпиле (мало пустых клеток) ход выбирается решателем эндшпиля.
+        Если ответ на эту позицию уже найден обдумыванием, он делается сразу.
+        Если простой поиск ничего не нашел, ход ищется среди всех допустимых ходов.
         """
+        pondered_result = self._make_pondered_move()
+        if pondered_result is not None:
+            return pondered_result
+
+        if self._uses_analysis(count_empty_cells(self.game.get_board())):
+            analyzed_result = self._make_analyzed_move(max_depth=self._required_depth(self.game.get_board()))
+            if analyzed_result is not None:
+                return analyzed_result
+
         board = self.game.get_board()
         board_size = self.game.board_size
         dictionary = self.game.dictionary
@@ -107,7 +142,189 @@ class ComputerPlayer:
                 # Если слово не найдено, восстанавливаем исходное значение клетки
                 board[r_new][c_new] = original_value
 
-        return False, None, None, None, None, None  # Не удалось сделать ход
+        # Простой поиск ищет слова только по прямой. Прежде чем сдаться,
+        # проверяем все ходы и делаем ход самым длинным словом
+        return self._make_longest_move()
+
+    def _make_longest_move(self):
+        """Делает ход самым длинным словом из всех допустимых ходов (find_moves)."""
+        solver = self.get_endgame_solver()
+        moves = find_moves(self.game.get_board(), solver.dictionary, solver.prefixes, self.game.get_used_words(),
+                           self.min_word_length)
+        if not moves:
+            return False, None, None, None, None, None  # Не удалось сделать ход
+        r, c, letter, word_coords, word = max(moves, key=lambda move: len(move[4]))
+        move_successful, move_msg = self.game.make_move(r, c, letter, word_coords)
+        if not move_successful:
+            return False, None, None, None, None, None
+        return True, letter, r, c, word, len(word)
+
+    def get_endgame_solver(self):
+        """Возвращает решатель эндшпиля, создавая его при первом обращении."""
+        if self.endgame_solver is None:
+            self.endgame_solver = EndgameSolver(self.game.dictionary,
+                                                min_word_length=self.min_word_length,
+                                                node_budget=self.endgame_node_budget,
+                                                time_limit=self.endgame_time_limit)
+        return self.endgame_solver
+
+    def analyze_position(self, max_depth=None):
+        """
+        Анализирует текущую позицию перебором (max_depth=None - до конца игры).
+        Сначала ищет достаточно глубокий анализ в кеше, новый результат сохраняет в кеш.
+        """
+        board = self.game.get_board()
+        used_words = self.game.get_used_words()
+        player_id = self.game.current_player_id
+
+        if self.cache is not None:
+            self._check_cache_dictionary()
+            cached = self.cache.get(board, used_words, player_id)
+            if cached is not None and self._is_deep_enough(cached, max_depth):
+                return cached
+
+        result = self.get_endgame_solver().solve(board, used_words, player_id, max_depth=max_depth)
+        if self.cache is not None:
+            self.cache.put(board, used_words, player_id, result)
+        return result
+
+    @staticmethod
+    def _is_deep_enough(result, max_depth):
+        """Подходит ли готовый анализ для поиска на глубину max_depth (None - до конца игры)."""
+        return result['complete'] or (max_depth is not None and result['depth'] >= max_depth)
+
+    def _required_depth(self, board):
+        """Глубина поиска для позиции: в эндшпиле - до конца игры (None), иначе search_depth."""
+        if count_empty_cells(board) <= self.endgame_threshold:
+            return None
+        return self.search_depth
+
+    def _uses_analysis(self, empty_cells):
+        """Ищется ли ход перебором при empty_cells пустых клетках: в эндшпиле всегда, иначе - только с кешем."""
+        return self.cache is not None or empty_cells <= self.endgame_threshold
+
+    def _check_cache_dictionary(self):
+        """Проверяет (один раз), что кеш открыт для словаря этой игры."""
+        if self._cache_checked:
+            return
+        if not self.cache.matches(self.game.dictionary):
+            raise ValueError("Кеш анализа открыт для другого словаря, чем словарь игры.")
+        self._cache_checked = True
+
+    def _make_analyzed_move(self, max_depth):
+        """
+        Делает ход, найденный перебором.
+        Возвращает None, если перебор не успел найти ход в пределах бюджета -
+        тогда используется обычный поиск.
+        """
+        return self._play_analyzed_move(self.analyze_position(max_depth))
+
+    def _play_analyzed_move(self, result):
+        """Делает ход из результата анализа (None - если хода в нем нет)."""
+        if result['move'] is None:
+            if result['complete']:
+                return False, None, None, None, None, None  # Ходов нет совсем
+            return None
+
+        r, c, letter, word_coords, word = result['move']
+        move_successful, move_msg = self.game.make_move(r, c, letter, word_coords)
+        if not move_successful:
+            return None
+        return True, letter, r, c, word, len(word)
+
+    def start_pondering(self, max_replies=20):
+        """
+        Запускает обдумывание на ходу соперника: в фоновом потоке перебираются
+        самые длинные ответы соперника, и для каждой получившейся позиции заранее
+        ищется ход компьютера. Обдумывание включается, только если после ответа
+        соперника компьютер сам будет искать ход перебором (см. _uses_analysis):
+        иначе ход делает простой поиск, и обдуманный ход играл бы сильнее только
+        при угаданном ответе. Таблица запомненных позиций решателя при этом
+        заполняется, поэтому и на непредсказанный ход перебор идет быстрее.
+        Повторный вызов в той же позиции ничего не делает.
+        """
+        board = self.game.get_board()
+        used_words = self.game.get_used_words()
+        opponent_id = self.game.current_player_id
+        ponder_position = position_key(board, used_words, opponent_id)
+        if self._ponder_thread is not None and self._ponder_position == ponder_position:
+            return
+
+        self.stop_pondering()
+        self.pondered = {}
+        # Любой ответ соперника занимает ровно одну пустую клетку
+        if not self._uses_analysis(count_empty_cells(board) - 1):
+            return
+        self._ponder_position = ponder_position
+        self._ponder_stop = threading.Event()
+        self._ponder_thread = threading.Thread(
+            target=self._ponder,
+            args=([row[:] for row in board], set(used_words), opponent_id, max_replies, self._ponder_stop),
+            daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self):
+        """
+        Останавливает обдумывание (вызывается, когда соперник сделал ход).
+        Уже найденные ответы сохраняются и используются в make_computer_move.
+        """
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+        self._ponder_position = None
+
+    def _ponder(self, board, used_words, opponent_id, max_replies, stop_event):
+        """
+        Фоновый поток обдумывания. Работает только с копиями поля и списка слов.
+        Решатель создается здесь же: ожидание фоновой загрузки словаря и построение
+        префиксов не задерживают ввод хода игроком. Основной поток обращается
+        к решателю только после stop_pondering, поэтому гонки нет.
+        """
+        solver = self.get_endgame_solver()
+        if stop_event.is_set():
+            return
+        player_id = other_player(opponent_id)
+        replies = find_moves(board, solver.dictionary, solver.prefixes, used_words, self.min_word_length)
+        replies.sort(key=lambda move: len(move[4]), reverse=True)
+
+        for r, c, letter, path, word in replies[:max_replies]:
+            if stop_event.is_set():
+                return
+            board[r][c] = letter
+            used_words.add(word)
+            result = solver.solve(board, used_words, player_id, max_depth=self._required_depth(board),
+                                  should_stop=stop_event.is_set)
+            if result['move'] is not None:
+                self.pondered[position_key(board, used_words, player_id)] = result
+            board[r][c] = ' '
+            used_words.discard(word)
+
+    def _make_pondered_move(self):
+        """
+        Делает ход, найденный обдумыванием для текущей позиции (None - если его нет).
+        Ответ используется, только если он не хуже обычного анализа: в эндшпиле
+        перебор должен быть полным, в середине игры - не мельче search_depth.
+        Иначе (например, обдумывание прервали) ход ищется заново, но уже
+        с заполненной обдумыванием таблицей позиций.
+        """
+        self.stop_pondering()
+        if not self.pondered:
+            return None
+        board = self.game.get_board()
+        used_words = self.game.get_used_words()
+        player_id = self.game.current_player_id
+        result = self.pondered.get(position_key(board, used_words, player_id))
+        self.pondered = {}
+        if result is None or not self._is_deep_enough(result, self._required_depth(board)):
+            self.ponder_stats['misses'] += 1
+            return None
+
+        self.ponder_stats['hits'] += 1
+        if self.cache is not None:
+            self.cache.put(board, used_words, player_id, result)
+        return self._play_analyzed_move(result)
 
 
 # Функция для проверки слова (если не импортируется из game_logic)
@@ -1,10 +1,13 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
-def load_dictionary(file_path="data/russian_words.txt", min_word_length=3):
+def load_dictionary(file_path="data/russian_words.txt", min_word_length=3, verbose=True):
     """
     Загружает словарь из текстового файла. Каждое слово в верхнем регистре.
     Возвращает множество слов для быстрого поиска.
+    verbose=False отключает сообщение об успешной загрузке (ошибки выводятся всегда).
     """
     if not os.path.exists(file_path):
         print(f"Ошибка: Файл словаря '{file_path}' не найден.")
@@ -18,18 +21,39 @@ def load_dictionary(file_path="data/russian_words.txt", min_word_length=3):
                 word = line.strip().upper()  # Удаляем пробелы и переводим в верхний регистр
                 if word.isalpha() and len(word) >= min_word_length:  # Проверяем, что это только буквы и нужной длины
                     words.add(word)
-        print(f"Словарь загружен успешно. Всего слов: {len(words)}")
+        if verbose:
+            print(f"Словарь загружен успешно. Всего слов: {len(words)}")
         return words
     except Exception as e:
         print(f"Ошибка при загрузке словаря: {e}")
         return set()
 
 
+def load_dictionary_async(file_path="data/russian_words.txt", min_word_length=3):
+    """
+    Начинает загрузку словаря в фоновом потоке и сразу возвращает Future.
+    Результат (множество слов) получается вызовом result(), который ждет окончания загрузки.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(load_dictionary, file_path, min_word_length, False)
+    executor.shutdown(wait=False)  # Поток завершится сам после загрузки
+    return future
+
+
 def is_word_valid(word, dictionary):
     """Проверяет, существует ли слово в словаре."""
     return word.upper() in dictionary
 
 
+def dictionary_fingerprint(dictionary):
+    """Отпечаток словаря: хеш отсортированного списка его слов."""
+    digest = hashlib.sha1()
+    for word in sorted(dictionary):
+        digest.update(word.encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
 if __name__ == "__main__":
     print("--- Тестирование Dictionary Handler ---")
 
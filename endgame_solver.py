@@ -0,0 +1,294 @@
+import time
+
+ALPHABET = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Верх, низ, лево, право
+INFINITY = float('inf')
+
+# Тип оценки в таблице запомненных позиций
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchAborted(Exception):
+    """Перебор прерван: исчерпан бюджет узлов или времени, или поиск отменен извне."""
+
+
+def build_prefixes(dictionary):
+    """
+    Строит множество всех префиксов слов словаря.
+    Нужно, чтобы обрывать обход поля, как только цепочка букв
+    перестает быть началом какого-либо слова.
+    """
+    prefixes = set()
+    for word in dictionary:
+        for i in range(1, len(word) + 1):
+            prefixes.add(word[:i])
+    return prefixes
+
+
+def count_empty_cells(board):
+    """Считает количество пустых клеток на поле."""
+    return sum(row.count(' ') for row in board)
+
+
+def position_key(board, used_words, player_id):
+    """Ключ позиции: буквы поля, использованные слова и чей ход."""
+    return ("".join("".join(row) for row in board), frozenset(used_words), player_id)
+
+
+def other_player(player_id):
+    """Возвращает номер соперника."""
+    return 1 if player_id == 2 else 2
+
+
+def find_moves(board, dictionary, prefixes, used_words, min_word_length=3):
+    """
+    Находит все допустимые ходы в позиции.
+    Ход - кортеж (строка, столбец, буква, координаты слова, слово).
+    Для каждой пары (клетка, буква) каждое слово возвращается один раз.
+    """
+    size = len(board)
+    found = {}  # (клетка, буква, слово) -> координаты слова
+    for r in range(size):
+        for c in range(size):
+            if board[r][c] == ' ':
+                for letter in ALPHABET:
+                    if letter in prefixes:
+                        _collect_words(board, dictionary, prefixes, used_words, min_word_length,
+                                       r, c, letter, [(r, c)], (r, c), letter, found)
+            elif board[r][c] in prefixes:
+                _collect_words(board, dictionary, prefixes, used_words, min_word_length,
+                               r, c, board[r][c], [(r, c)], None, None, found)
+    return [(cell[0], cell[1], letter, path, word) for (cell, letter, word), path in found.items()]
+
+
+def _collect_words(board, dictionary, prefixes, used_words, min_word_length,
+                   r, c, word, path, new_cell, letter, found):
+    """
+    Обход в глубину по соседним клеткам с отсечением по префиксам.
+    Путь может пройти ровно через одну пустую клетку - она становится новой буквой,
+    и при входе в нее перебираются все буквы, которые продолжают какой-либо префикс.
+    Пустая клетка на пути слова из 3+ букв всегда примыкает к занятой,
+    поэтому отдельная проверка размещения не нужна.
+    """
+    if new_cell is not None and len(word) >= min_word_length and word in dictionary \
+            and word not in used_words and (new_cell, letter, word) not in found:
+        found[(new_cell, letter, word)] = list(path)
+
+    size = len(board)
+    for dr, dc in DIRECTIONS:
+        nr, nc = r + dr, c + dc
+        if not (0 <= nr < size and 0 <= nc < size) or (nr, nc) in path:
+            continue
+        cell = board[nr][nc]
+        path.append((nr, nc))
+        if cell != ' ':
+            if word + cell in prefixes:
+                _collect_words(board, dictionary, prefixes, used_words, min_word_length,
+                               nr, nc, word + cell, path, new_cell, letter, found)
+        elif new_cell is None:
+            for ch in ALPHABET:
+                if word + ch in prefixes:
+                    _collect_words(board, dictionary, prefixes, used_words, min_word_length,
+                                   nr, nc, word + ch, path, (nr, nc), ch, found)
+        path.pop()
+
+
+class EndgameSolver:
+    """
+    Точный решатель эндшпиля.
+    Перебирает ходы до конца игры (негамакс по разнице очков с альфа-бета
+    отсечением) с запоминанием позиций по ключу (поле, использованные слова, чей ход).
+    Поиск идет с итеративным углублением, поэтому при исчерпании бюджета узлов
+    или времени возвращается лучший ход последней полностью просчитанной глубины.
+    Списки ходов запоминаются вместе с позициями, поэтому следующая итерация
+    углубления не ищет ходы на уже пройденных позициях заново.
+    Игра считается оконченной, когда у игрока, чей ход, нет допустимых ходов.
+    """
+
+    def __init__(self, dictionary, min_word_length=3, node_budget=20000, time_limit=5.0, max_memo_size=200000):
+        self.dictionary = dictionary
+        self.prefixes = build_prefixes(dictionary)
+        self.min_word_length = min_word_length
+        self.node_budget = node_budget
+        self.time_limit = time_limit  # Секунд на один вызов solve (None - без ограничения)
+        self.max_memo_size = max_memo_size
+        # ключ позиции -> (оценка, лучший ход, глубина, точная ли оценка, тип оценки)
+        self.memo = {}
+        # ключ позиции -> список ходов в ней (упорядоченный для перебора)
+        self.move_lists = {}
+        self.nodes = 0
+        self.cache_hits = 0
+        self.stats = {'solves': 0, 'complete_solves': 0, 'total_time': 0.0, 'last': None}
+
+    def solve(self, board, used_words, player_id, max_depth=None, should_stop=None):
+        """
+        Ищет лучший ход для игрока player_id.
+        board и used_words не изменяются (перебор идет на копиях).
+        max_depth ограничивает глубину (None - до конца игры),
+        should_stop - необязательная функция, по которой поиск можно отменить.
+        Возвращает словарь: ход, главную линию, оценку (разница очков до конца
+        игры с точки зрения ходящего), достигнутую глубину и признак полного решения.
+        """
+        board = [row[:] for row in board]
+        used_words = set(used_words)
+        if len(self.memo) > self.max_memo_size or len(self.move_lists) > self.max_memo_size:
+            self.memo.clear()
+            self.move_lists.clear()
+
+        self.nodes = 0
+        self.cache_hits = 0
+        self._should_stop = should_stop
+        start_time = time.perf_counter()
+        self._deadline = start_time + self.time_limit if self.time_limit is not None else None
+
+        # Игра не может длиться дольше, чем осталось пустых клеток
+        depth_limit = count_empty_cells(board)
+        if max_depth is not None:
+            depth_limit = min(depth_limit, max_depth)
+
+        result = {'move': None, 'line': [], 'score': 0, 'depth': 0, 'complete': False}
+        for depth in range(1, depth_limit + 1):
+            try:
+                score, exact = self._search(board, used_words, player_id, depth, -INFINITY, INFINITY)
+            except SearchAborted:
+                break
+            result = {'move': None, 'line': [], 'score': score, 'depth': depth, 'complete': exact}
+            result['line'] = self._principal_line(board, used_words, player_id, depth)
+            if result['line']:
+                result['move'] = result['line'][0][1]
+            if exact:
+                break
+        if depth_limit == 0:
+            result['complete'] = True
+
+        elapsed = time.perf_counter() - start_time
+        self.stats['solves'] += 1
+        self.stats['total_time'] += elapsed
+        if result['complete']:
+            self.stats['complete_solves'] += 1
+        self.stats['last'] = {'nodes': self.nodes, 'cache_hits': self.cache_hits, 'time': elapsed,
+                              'depth': result['depth'], 'complete': result['complete']}
+        return result
+
+    def _search(self, board, used_words, player_id, depth, alpha, beta):
+        """
+        Негамакс с альфа-бета отсечением.
+        Возвращает (разница очков до конца для ходящего, точна ли оценка),
+        где оценка точна, если все ветви досчитаны до конца игры, а не до горизонта.
+        """
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise SearchAborted()
+        if self._should_stop is not None and self._should_stop():
+            raise SearchAborted()
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchAborted()
+
+        original_alpha = alpha
+        key = position_key(board, used_words, player_id)
+        entry = self.memo.get(key)
+        tt_move = None
+        if entry is not None:
+            value, tt_move, searched_depth, exact, bound = entry
+            if exact or searched_depth >= depth:
+                if bound == EXACT:
+                    self.cache_hits += 1
+                    return value, exact
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    self.cache_hits += 1
+                    return value, exact
+
+        moves = self.move_lists.get(key)
+        if moves is None:
+            moves = find_moves(board, self.dictionary, self.prefixes, used_words, self.min_word_length)
+            # Сначала длинные слова - так отсечения срабатывают раньше
+            moves.sort(key=lambda move: len(move[4]), reverse=True)
+            self.move_lists[key] = moves
+        if not moves:
+            self.memo[key] = (0, None, depth, True, EXACT)
+            return 0, True
+
+        # Запомненный лучший ход перебирается первым
+        if tt_move is not None and tt_move in moves:
+            moves = [tt_move] + [move for move in moves if move != tt_move]
+
+        best_value = None
+        best_move = None
+        all_exact = True
+        for move in moves:
+            r, c, letter, path, word = move
+            if depth == 1:
+                # На горизонте ответ соперника не считаем; точно, только если поле заполнится
+                child_value, child_exact = 0, count_empty_cells(board) == 1
+            else:
+                board[r][c] = letter
+                used_words.add(word)
+                try:
+                    child_value, child_exact = self._search(board, used_words, other_player(player_id),
+                                                            depth - 1, len(word) - beta, len(word) - alpha)
+                finally:
+                    board[r][c] = ' '
+                    used_words.discard(word)
+            value = len(word) - child_value
+            all_exact = all_exact and child_exact
+            if best_value is None or value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.memo[key] = (best_value, best_move, depth, all_exact, bound)
+        return best_value, all_exact
+
+    def _principal_line(self, board, used_words, player_id, depth):
+        """Восстанавливает главную линию по запомненным позициям: список (игрок, ход)."""
+        board = [row[:] for row in board]
+        used_words = set(used_words)
+        line = []
+        for _ in range(depth):
+            entry = self.memo.get(position_key(board, used_words, player_id))
+            if entry is None or entry[1] is None:
+                break
+            move = entry[1]
+            line.append((player_id, move))
+            r, c, letter, _, word = move
+            board[r][c] = letter
+            used_words.add(word)
+            player_id = other_player(player_id)
+        return line
+
+
+if __name__ == "__main__":
+    print("--- Тестирование Endgame Solver ---")
+
+    test_dictionary = {"ПЛАЦ", "ПЛОТ", "СТОЛ", "ЛОТ", "ТОК", "КОТ", "ПОЛ"}
+    test_board = [
+        ['П', 'Л', 'А', 'Ц'],
+        [' ', 'О', ' ', 'Т'],
+        ['С', 'Т', 'О', 'Л'],
+        ['К', 'О', 'Т', ' '],
+    ]
+    for row in test_board:
+        print(" ".join(row))
+
+    solver = EndgameSolver(test_dictionary, node_budget=5000)
+    result = solver.solve(test_board, {"ПЛАЦ"}, player_id=2)
+    print(f"Лучший ход: {result['move']}")
+    print(f"Главная линия: {result['line']}")
+    print(f"Оценка: {result['score']}, глубина: {result['depth']}, решено полностью: {result['complete']}")
+    print(f"Статистика: {solver.stats['last']}")
+
+    assert result['complete']
+    assert result['move'] is not None
+    print("Тестирование Endgame Solver завершено.")
@@ -1,20 +1,43 @@
 import os
+from concurrent.futures import Future
 from dictionary_handler import load_dictionary, is_word_valid
+from update_stream import UpdateStream
 
 
 class BaldaGame:
-    def __init__(self, board_size=5, initial_word="БАЛДА", dictionary_path="data/russian_words.txt"):
+    def __init__(self, board_size=5, initial_word="БАЛДА", dictionary_path="data/russian_words.txt",
+                 dictionary=None):
+        """
+        dictionary - уже загруженный словарь (множество слов) или Future из
+        load_dictionary_async. Если он не передан, словарь загружается из dictionary_path.
+        """
         self.board_size = board_size
         self.board = [[' ' for _ in range(board_size)] for _ in range(board_size)]
         self.used_words = set()
         self.players = {1: {'score': 0, 'name': 'Игрок 1'},
                         2: {'score': 0, 'name': 'Игрок 2'}}
         self.current_player_id = 1
-        self.dictionary = load_dictionary(dictionary_path)
+        if dictionary is None:
+            dictionary = load_dictionary(dictionary_path)
+        self._dictionary = dictionary
+        # Рассылка изменений зрителям. Ход применяется и рассылается одним шагом (UpdateStream.commit)
+        self._updates = UpdateStream(self._stream_snapshot)
+        self._next_player_id = None  # Чей ход после разосланного хода, пока не вызван switch_player
 
         # Инициализация поля начальным словом
         self._place_initial_word(initial_word.upper())
 
+    @property
+    def dictionary(self):
+        """Словарь игры. Если он еще загружается в фоне, ждет окончания загрузки."""
+        if isinstance(self._dictionary, Future):
+            self._dictionary = self._dictionary.result()
+        return self._dictionary
+
+    @dictionary.setter
+    def dictionary(self, dictionary):
+        self._dictionary = dictionary
+
     def _place_initial_word(self, word):
         """Размещает начальное слово в центре поля."""
         if len(word) > self.board_size:
@@ -33,6 +56,7 @@ class BaldaGame:
     def switch_player(self):
         """Переключает текущего игрока."""
         self.current_player_id = 1 if self.current_player_id == 2 else 2
+        self._next_player_id = None
 
     def get_board(self):
         """Возвращает текущее состояние игрового поля."""
@@ -112,10 +136,18 @@ class BaldaGame:
         if (row, col) not in word_coords:
             return False, "Новая буква должна быть частью составленного слова."
 
-        # 5. Все проверки пройдены, совершаем ход
-        self.board[row][col] = letter  # Окончательно размещаем букву
-        self.used_words.add(composed_word)
-        self.players[self.current_player_id]['score'] += len(composed_word)
+        # 5. Все проверки пройдены, совершаем ход и рассылаем его подписчикам
+        next_player_id = 1 if self.current_player_id == 2 else 2  # Как в switch_player
+        update = {'type': 'move',
+                  'player_id': self.current_player_id,
+                  'row': row,
+                  'col': col,
+                  'letter': letter,
+                  'word': composed_word,
+                  'path': list(word_coords),
+                  'score_delta': len(composed_word),
+                  'next_player_id': next_player_id}
+        self._updates.commit(lambda: self._apply_move(row, col, letter, composed_word, next_player_id), update)
 
         return True, f"Отлично! Слово '{composed_word}' (очки: {len(composed_word)}) добавлено."
 
@@ -189,6 +221,38 @@ class BaldaGame:
 
         return word, True  # Здесь True, так как проверили смежность и уникальность
 
+    def subscribe(self, max_queue=100):
+        """
+        Подписывает зрителя или удаленного клиента на изменения игры.
+        Возвращает Subscription: первым сообщением придет снимок игры,
+        затем - изменение после каждого успешного хода.
+        """
+        return self._updates.subscribe(max_queue)
+
+    def unsubscribe(self, subscription):
+        """Отписывает зрителя от изменений игры."""
+        self._updates.unsubscribe(subscription)
+
+    def get_snapshot(self, current_player_id=None):
+        """Возвращает снимок игры: поле, использованные слова, очки и чей ход."""
+        return {'board_size': self.board_size,
+                'board': ["".join(row) for row in self.board],
+                'used_words': sorted(self.used_words),
+                'players': {player_id: {'name': data['name'], 'score': data['score']}
+                            for player_id, data in self.players.items()},
+                'current_player_id': current_player_id or self.current_player_id}
+
+    def _apply_move(self, row, col, letter, word, next_player_id):
+        """Применяет проверенный ход (вызывается из UpdateStream.commit под его блокировкой)."""
+        self.board[row][col] = letter  # Окончательно размещаем букву
+        self.used_words.add(word)
+        self.players[self.current_player_id]['score'] += len(word)
+        self._next_player_id = next_player_id
+
+    def _stream_snapshot(self):
+        """Снимок для подписчиков: после хода в нем уже ход следующего игрока."""
+        return self.get_snapshot(self._next_player_id)
+
     def get_score(self, player_id):
         return self.players[player_id]['score']
 
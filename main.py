@@ -1,61 +1,31 @@
+from dictionary_handler import load_dictionary_async
 from game_logic import BaldaGame
 from user_interface import (
     display_welcome_message,
     get_game_mode,
-    display_board,
     get_player_move_input,
     display_message,
     display_scores,
-    ask_to_play_again
+    ask_to_play_again,
+    TerminalRenderer
 )
 from computer_player import ComputerPlayer
 
 
 def run_player_vs_player(game):
     """Режим игры: Игрок против Игрока."""
-    while True:
-        display_board(game.get_board())
-        display_scores(game.players)
-
-        player_name = game.get_current_player_name()
-        display_message(f"Ход игрока {player_name}.")
-
-        row, col, letter, word_coords = get_player_move_input(player_name, game.board_size)
-
-        # Временная логика, если пользователь не ввел координаты слова, хотя он должен
-        if not word_coords:
-            display_message("Вы не указали координаты слова. Попробуйте еще раз.")
-            continue
-
-        move_successful, message = game.make_move(row, col, letter, word_coords)
-        display_message(message)
-
-        if move_successful:
-            game.switch_player()
-
-        # Проверка на конец игры (например, нет пустых клеток или нет возможных ходов)
-        # Для простоты: игра продолжается, пока кто-то не устанет.
-        # В реальной Балде есть правила завершения.
-        if not ask_to_play_again():  # Здесь спрашиваем, хочет ли игрок продолжить игру (а не сыграть заново)
-            break
-
-    display_message("Игра завершена. Итоговые очки:")
-    display_scores(game.players)
-
-
-def run_player_vs_computer(game):
-    """Режим игры: Игрок против Компьютера."""
-    computer_player = ComputerPlayer(game)
+    renderer = TerminalRenderer()
 
-    while True:
-        display_board(game.get_board())
-        display_scores(game.players)
+    try:
+        while True:
+            renderer.render(game.get_board(), game.players)
 
-        if game.current_player_id == 1:  # Ход человека
             player_name = game.get_current_player_name()
             display_message(f"Ход игрока {player_name}.")
+
             row, col, letter, word_coords = get_player_move_input(player_name, game.board_size)
 
+            # Временная логика, если пользователь не ввел координаты слова, хотя он должен
             if not word_coords:
                 display_message("Вы не указали координаты слова. Попробуйте еще раз.")
                 continue
@@ -65,25 +35,68 @@ def run_player_vs_computer(game):
 
             if move_successful:
                 game.switch_player()
-            else:
-                # Если ход человека не удался, даем ему еще попытку
-                display_message("Пожалуйста, попробуйте еще раз.")
-                continue
 
-        else:  # Ход компьютера
-            display_message("Ход компьютера...")
-            ai_success, letter, r, c, word, score = computer_player.make_computer_move()
+            # Проверка на конец игры (например, нет пустых клеток или нет возможных ходов)
+            # Для простоты: игра продолжается, пока кто-то не устанет.
+            # В реальной Балде есть правила завершения.
+            if not ask_to_play_again():  # Здесь спрашиваем, хочет ли игрок продолжить игру (а не сыграть заново)
+                break
+    finally:
+        # Кадр открепляется и при исключении или Ctrl+C, иначе терминал останется с областью прокрутки
+        renderer.close()
 
-            if ai_success:
-                display_message(
-                    f"Компьютер поставил '{letter}' в ({r},{c}) и составил слово '{word}' (+{score} очков).")
-                game.switch_player()
-            else:
-                display_message("Компьютер не смог найти ход. Вы выиграли!")
-                break  # Компьютер не может ходить, игра окончена
+    display_message("Игра завершена. Итоговые очки:")
+    display_scores(game.players)
 
-        if not ask_to_play_again():  # Здесь спрашиваем, хочет ли игрок продолжить игру (а не сыграть заново)
-            break
+
+def run_player_vs_computer(game):
+    """Режим игры: Игрок против Компьютера."""
+    computer_player = ComputerPlayer(game)
+    renderer = TerminalRenderer()
+
+    try:
+        while True:
+            renderer.render(game.get_board(), game.players)
+
+            if game.current_player_id == 1:  # Ход человека
+                player_name = game.get_current_player_name()
+                display_message(f"Ход игрока {player_name}.")
+                # Пока игрок вводит ход, компьютер заранее обдумывает ответы
+                computer_player.start_pondering()
+                row, col, letter, word_coords = get_player_move_input(player_name, game.board_size)
+
+                if not word_coords:
+                    display_message("Вы не указали координаты слова. Попробуйте еще раз.")
+                    continue
+
+                move_successful, message = game.make_move(row, col, letter, word_coords)
+                display_message(message)
+
+                if move_successful:
+                    computer_player.stop_pondering()
+                    game.switch_player()
+                else:
+                    # Если ход человека не удался, даем ему еще попытку
+                    display_message("Пожалуйста, попробуйте еще раз.")
+                    continue
+
+            else:  # Ход компьютера
+                display_message("Ход компьютера...")
+                ai_success, letter, r, c, word, score = computer_player.make_computer_move()
+
+                if ai_success:
+                    display_message(
+                        f"Компьютер поставил '{letter}' в ({r},{c}) и составил слово '{word}' (+{score} очков).")
+                    game.switch_player()
+                else:
+                    display_message("Компьютер не смог найти ход. Вы выиграли!")
+                    break  # Компьютер не может ходить, игра окончена
+
+            if not ask_to_play_again():  # Здесь спрашиваем, хочет ли игрок продолжить игру (а не сыграть заново)
+                break
+    finally:
+        computer_player.stop_pondering()
+        renderer.close()
 
     display_message("Игра завершена. Итоговые очки:")
     display_scores(game.players)
@@ -92,13 +105,16 @@ def run_player_vs_computer(game):
 def main():
     """Главная функция для запуска игры Балда."""
 
+    # Словарь загружается в фоне, пока пользователь читает правила и вводит имена
+    dictionary = load_dictionary_async("data/russian_words.txt")
+
     display_welcome_message()
 
     while True:
         game_mode = get_game_mode()
 
         # Создаем новый экземпляр игры для каждого нового раунда
-        game = BaldaGame(board_size=5, initial_word="БАЛДА")  # Можно передавать путь к словарю
+        game = BaldaGame(board_size=5, initial_word="БАЛДА", dictionary=dictionary)
 
         if game_mode == "player_vs_player":
             game.players[1]['name'] = input("Имя Игрока 1: ") or "Игрок 1"
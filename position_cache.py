@@ -0,0 +1,158 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from dictionary_handler import dictionary_fingerprint
+
+
+def position_hash(board, used_words, player_id, fingerprint):
+    """
+    Канонический хеш позиции: размер поля, буквы поля, использованные слова
+    (в отсортированном виде), чей ход и отпечаток словаря.
+    """
+    parts = [str(len(board)),
+             "".join("".join(row) for row in board),
+             ",".join(sorted(used_words)),
+             str(player_id),
+             fingerprint]
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+
+class PositionCache:
+    """
+    Постоянный кеш анализа позиций в базе SQLite.
+    Хранит лучший ход, оценку и глубину поиска. Размер ограничен max_entries:
+    лишние записи вытесняются по давности последнего обращения (LRU).
+    База открывается в режиме WAL, поэтому ее могут одновременно читать
+    несколько процессов. Отпечаток словаря входит в ключ позиции, поэтому
+    процессы с разными словарями могут делить одну базу; записи для словаря,
+    который больше не используется, со временем вытесняются как давно неиспользуемые.
+    """
+
+    EVICT_INTERVAL = 100  # Как часто (в записях) проверять превышение размера
+    # Время обращения обновляется не чаще этого (в секундах), чтобы чтение не занимало базу на запись
+    ACCESS_UPDATE_INTERVAL = 600
+
+    def __init__(self, dictionary, db_path="data/analysis_cache.sqlite", max_entries=100000):
+        """dictionary - словарь игры (множество слов), для которого сохраняются анализы."""
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._puts_since_evict = 0
+        self.dictionary = dictionary
+        self.fingerprint = dictionary_fingerprint(dictionary)
+
+        self.connection = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            "key TEXT PRIMARY KEY, move TEXT, score INTEGER, depth INTEGER, "
+            "complete INTEGER, last_access REAL)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS positions_last_access ON positions (last_access)")
+
+    def matches(self, dictionary):
+        """Проверяет, что кеш открыт для этого словаря."""
+        return dictionary is self.dictionary or dictionary_fingerprint(dictionary) == self.fingerprint
+
+    def get(self, board, used_words, player_id):
+        """
+        Возвращает сохраненный анализ позиции или None.
+        Формат совпадает с результатом EndgameSolver.solve (без главной линии).
+        """
+        key = position_hash(board, used_words, player_id, self.fingerprint)
+        row = self.connection.execute(
+            "SELECT move, score, depth, complete, last_access FROM positions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[4] >= self.ACCESS_UPDATE_INTERVAL:
+            self.connection.execute("UPDATE positions SET last_access = ? WHERE key = ?", (now, key))
+
+        move = json.loads(row[0])
+        r, c, letter, path, word = move
+        move = (r, c, letter, [tuple(cell) for cell in path], word)
+        return {'move': move, 'line': [(player_id, move)], 'score': row[1], 'depth': row[2],
+                'complete': bool(row[3])}
+
+    def put(self, board, used_words, player_id, result):
+        """
+        Сохраняет анализ позиции. Уже сохраненный более глубокий
+        или полный анализ не перезаписывается менее точным.
+        """
+        if result['move'] is None:
+            return
+        key = position_hash(board, used_words, player_id, self.fingerprint)
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute(
+                "SELECT depth, complete FROM positions WHERE key = ?", (key,)).fetchone()
+            if row is not None and (row[1] or row[0] > result['depth']) and not result['complete']:
+                return
+            self.connection.execute(
+                "INSERT OR REPLACE INTO positions (key, move, score, depth, complete, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(result['move'], ensure_ascii=False), result['score'], result['depth'],
+                 int(result['complete']), time.time()))
+
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= self.EVICT_INTERVAL:
+            self.evict()
+
+    def evict(self):
+        """Удаляет самые давно использованные записи сверх max_entries."""
+        self._puts_since_evict = 0
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute(
+                "DELETE FROM positions WHERE key IN ("
+                "SELECT key FROM positions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self):
+        """Вытесняет лишние записи и закрывает базу."""
+        self.evict()
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("--- Тестирование Position Cache ---")
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        cache_path = os.path.join(test_dir, "cache.sqlite")
+        test_dictionary = {"ПЛАЦ", "ПЛОТ"}
+        cache = PositionCache(test_dictionary, cache_path, max_entries=2)
+        board = [['П', 'Л', 'А', 'Ц'], [' ', 'О', ' ', ' '], [' ', 'Т', ' ', ' '], [' ', ' ', ' ', ' ']]
+        result = {'move': (1, 0, 'Л', [(0, 0), (1, 0), (1, 1), (2, 1)], 'ПЛОТ'), 'score': 4, 'depth': 2,
+                  'complete': False}
+        cache.put(board, {"ПЛАЦ"}, 1, result)
+
+        cached = cache.get(board, {"ПЛАЦ"}, 1)
+        print(f"Из кеша: {cached}")
+        assert cached['move'] == result['move'] and cached['depth'] == 2
+        assert cache.get(board, {"ПЛАЦ"}, 2) is None  # Другой игрок - другая позиция
+        assert cache.matches({"ПЛОТ", "ПЛАЦ"}) and not cache.matches({"ПЛОТ"})
+
+        # Вытеснение: записей не больше max_entries
+        for player_id in range(3, 6):
+            cache.put(board, set(), player_id, result)
+        cache.evict()
+        assert len(cache) == 2
+        assert cache.get(board, {"ПЛАЦ"}, 1) is None  # Самая старая запись вытеснена
+
+        # Кеш, открытый для другого словаря, не видит чужих анализов, но и не стирает их
+        cache.put(board, {"ПЛАЦ"}, 1, result)
+        other_cache = PositionCache(test_dictionary | {"СТОЛ"}, cache_path)
+        assert other_cache.get(board, {"ПЛАЦ"}, 1) is None
+        other_cache.close()
+        assert cache.get(board, {"ПЛАЦ"}, 1) is not None
+        cache.close()
+
+    print("Тестирование Position Cache завершено.")
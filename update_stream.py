@@ -0,0 +1,229 @@
+import json
+import queue
+import threading
+
+
+def encode(message):
+    """
+    Кодирует сообщение в компактный JSON (bytes в UTF-8).
+    Сообщение кодируется один раз и в таком виде попадает в очереди всех
+    подписчиков: bytes неизменяемы, поэтому ни один подписчик не может изменить
+    сообщение для остальных, а удаленному клиенту их можно отправить как есть.
+    """
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode(data):
+    """Декодирует сообщение из подписки в словарь."""
+    return json.loads(data)
+
+
+class Subscription:
+    """
+    Подписка на обновления игры: ограниченная очередь снимков и изменений.
+    Первое сообщение в очереди - всегда снимок игры, дальше идут изменения.
+    Сообщения - закодированный JSON (см. encode, decode).
+    """
+
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.resyncs = 0  # Сколько раз очередь переполнялась и заменялась снимком
+
+    def get(self, timeout=None):
+        """Возвращает следующее сообщение, ожидая его не дольше timeout (queue.Empty при таймауте)."""
+        return self.queue.get(timeout=timeout)
+
+    def get_nowait(self):
+        """Возвращает следующее сообщение без ожидания (queue.Empty, если сообщений нет)."""
+        return self.queue.get_nowait()
+
+
+class UpdateStream:
+    """
+    Рассылка изменений игры подписчикам (зрителям, удаленным клиентам).
+    У каждого подписчика своя очередь ограниченного размера, поэтому медленный
+    подписчик не задерживает игру: при переполнении его очередь очищается,
+    и вместо пропущенных изменений он получает свежий снимок.
+    """
+
+    def __init__(self, snapshot_function, max_queue=100):
+        self._snapshot_function = snapshot_function
+        self.max_queue = max_queue
+        self.seq = 0  # Номер последнего изменения
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, max_queue=None):
+        """Добавляет подписчика. Он сразу получает снимок текущего состояния игры."""
+        subscription = Subscription(max_queue if max_queue is not None else self.max_queue)
+        with self._lock:
+            subscription.queue.put_nowait(self._snapshot(self._snapshot_function))
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Удаляет подписчика."""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def __len__(self):
+        """Число подписчиков."""
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, update, snapshot_function=None):
+        """
+        Рассылает изменение всем подписчикам, присваивая ему очередной номер.
+        snapshot_function задает снимок состояния после этого изменения,
+        если кому-то из подписчиков понадобится пересинхронизация.
+        """
+        with self._lock:
+            self._publish(update, snapshot_function)
+
+    def commit(self, apply_function, update, snapshot_function=None):
+        """
+        Применяет изменение к игре (apply_function) и рассылает его одним шагом.
+        Новый подписчик не может получить снимок между изменением игры и рассылкой,
+        поэтому изменение не попадет к нему дважды - и в снимке, и отдельным сообщением.
+        """
+        with self._lock:
+            apply_function()
+            self._publish(update, snapshot_function)
+
+    def _publish(self, update, snapshot_function):
+        self.seq += 1
+        if not self._subscribers:
+            return
+        update = encode(dict(update, seq=self.seq))
+        snapshot = None
+        for subscription in self._subscribers:
+            try:
+                subscription.queue.put_nowait(update)
+            except queue.Full:
+                if snapshot is None:
+                    snapshot = self._snapshot(snapshot_function or self._snapshot_function)
+                self._resync(subscription, snapshot)
+
+    def _snapshot(self, snapshot_function):
+        snapshot = snapshot_function()
+        snapshot['type'] = 'snapshot'
+        snapshot['seq'] = self.seq
+        return encode(snapshot)
+
+    def _resync(self, subscription, snapshot):
+        """Заменяет содержимое переполненной очереди снимком."""
+        while True:
+            try:
+                subscription.queue.get_nowait()
+            except queue.Empty:
+                break
+        subscription.queue.put_nowait(snapshot)
+        subscription.resyncs += 1
+
+
+def apply_update(state, update):
+    """
+    Применяет сообщение из подписки (bytes или уже декодированный словарь)
+    к состоянию игры на стороне клиента.
+    Снимок заменяет состояние целиком, изменение применяется к текущему.
+    Возвращает новое состояние; при пропуске изменения выбрасывает ValueError.
+    """
+    if isinstance(update, bytes):
+        update = decode(update)
+    if update['type'] == 'snapshot':
+        # В JSON ключи словаря - строки, номера игроков восстанавливаются
+        return {'seq': update['seq'],
+                'board': [list(row) for row in update['board']],
+                'used_words': set(update['used_words']),
+                'players': {int(player_id): dict(data) for player_id, data in update['players'].items()},
+                'current_player_id': update['current_player_id']}
+
+    if state is None or update['seq'] != state['seq'] + 1:
+        raise ValueError("Пропущено изменение: нужен новый снимок.")
+
+    state['seq'] = update['seq']
+    state['board'][update['row']][update['col']] = update['letter']
+    state['used_words'].add(update['word'])
+    state['players'][update['player_id']]['score'] += update['score_delta']
+    state['current_player_id'] = update['next_player_id']
+    return state
+
+
+if __name__ == "__main__":
+    from game_logic import BaldaGame
+
+    print("--- Тестирование Update Stream ---")
+
+    test_dictionary = {"БАЛДА", "ФАЛДА", "ЛАДА", "ДАЛЬ", "БАЛЛ"}
+    game = BaldaGame(board_size=5, initial_word="БАЛДА", dictionary=test_dictionary)
+    early = game.subscribe()
+    slow = game.subscribe(max_queue=2)
+
+    test_moves = [
+        (1, 1, 'Ф', [(1, 1), (2, 1), (2, 2), (2, 3), (2, 4)]),  # ФАЛДА
+        (3, 3, 'Ь', [(2, 3), (2, 4), (2, 2), (3, 2)]),  # Неверный ход: не публикуется
+        (1, 2, 'Л', [(2, 0), (2, 1), (2, 2), (1, 2)]),  # БАЛЛ: медленный подписчик переполняется
+    ]
+    late = None
+    for i, (row, col, letter, word_coords) in enumerate(test_moves):
+        move_successful, message = game.make_move(row, col, letter, word_coords)
+        print(message)
+        if move_successful:
+            game.switch_player()
+        if i == 0:
+            late = game.subscribe()  # Подписка посреди игры
+
+    first = early.get_nowait()
+    assert isinstance(first, bytes)  # Готово к отправке по сети и неизменяемо
+    assert decode(first)['type'] == 'snapshot' and decode(first)['seq'] == 0
+
+    final = game.get_snapshot()
+    for subscription in (early, slow, late):
+        state = apply_update(None, first) if subscription is early else None
+        while True:
+            try:
+                state = apply_update(state, subscription.get_nowait())
+            except queue.Empty:
+                break
+        assert ["".join(row) for row in state['board']] == final['board']
+        assert sorted(state['used_words']) == final['used_words']
+        assert state['players'] == final['players']
+        assert state['current_player_id'] == final['current_player_id']
+    print(f"Пересинхронизаций медленного подписчика: {slow.resyncs}")
+
+    # Переполнение: медленный подписчик получает снимок вместо пропущенных изменений
+    game = BaldaGame(board_size=5, initial_word="БАЛДА", dictionary=test_dictionary)
+    slow = game.subscribe(max_queue=1)
+    assert game.make_move(1, 1, 'Ф', [(1, 1), (2, 1), (2, 2), (2, 3), (2, 4)])[0]
+    game.switch_player()
+    assert slow.resyncs == 1
+    resync = decode(slow.get_nowait())
+    assert resync['type'] == 'snapshot' and resync['seq'] == 1 and resync['current_player_id'] == 2
+    assert resync['board'][1] == " Ф   "
+
+    # Подписка во время хода ждет его рассылки: ход не приходит дважды (в снимке и изменением)
+    game = BaldaGame(board_size=5, initial_word="БАЛДА", dictionary=test_dictionary)
+    game.subscribe()
+    racing = []
+    subscriber = threading.Thread(target=lambda: racing.append(game.subscribe()))
+    stream_apply = game._apply_move
+
+    def apply_with_subscriber(*args):
+        stream_apply(*args)
+        subscriber.start()
+        subscriber.join(0.1)  # Игра уже изменена: подписчик должен ждать, пока ход не будет разослан
+
+    game._apply_move = apply_with_subscriber
+    assert game.make_move(1, 1, 'Ф', [(1, 1), (2, 1), (2, 2), (2, 3), (2, 4)])[0]
+    game.switch_player()
+    subscriber.join()
+    state = None
+    while True:
+        try:
+            state = apply_update(state, racing[0].get_nowait())
+        except queue.Empty:
+            break
+    assert state['players'][1]['score'] == game.get_score(1) == 5
+
+    print("Тестирование Update Stream завершено.")
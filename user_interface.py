@@ -1,7 +1,53 @@
+import os
+import shutil
+import sys
+
+# Управляющие последовательности ANSI
+ANSI_CLEAR = "\x1b[2J\x1b[H"  # Очистить экран и поставить курсор в начало
+ANSI_SAVE_CURSOR = "\x1b7"
+ANSI_RESTORE_CURSOR = "\x1b8"
+ANSI_CLEAR_LINE = "\x1b[2K"
+ANSI_RESET_SCROLL_REGION = "\x1b[r"
+
+
+_ansi_supported = None
+
+
+def ansi_supported():
+    """
+    Проверяет, понимает ли терминал escape-последовательности ANSI.
+    В консоли Windows пытается включить их обработку (режим виртуального терминала).
+    """
+    global _ansi_supported
+    if _ansi_supported is None:
+        _ansi_supported = os.name != 'nt' or _enable_windows_ansi()
+    return _ansi_supported
+
+
+def _enable_windows_ansi():
+    """Включает обработку ANSI в консоли Windows 10+. Возвращает False, если это невозможно."""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        return False
+
+
 def clear_screen():
-    """Очищает экран терминала (работает на большинстве систем)."""
-    import os
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """
+    Очищает экран терминала escape-последовательностью ANSI (без запуска внешней команды).
+    В старых консолях Windows без поддержки ANSI используется 'cls'.
+    """
+    if ansi_supported():
+        sys.stdout.write(ANSI_CLEAR)
+        sys.stdout.flush()
+    else:
+        os.system('cls')
 
 
 def display_welcome_message():
@@ -34,17 +80,23 @@ def get_game_mode():
             print("Некорректный выбор. Пожалуйста, введите 1 или 2.")
 
 
-def display_board(board):
-    """Отображает игровое поле в консоли."""
+def format_board(board):
+    """Возвращает строки изображения игрового поля (первая строка пустая)."""
     board_size = len(board)
-    print("\n   " + " ".join([str(i) for i in range(board_size)]))  # Номера столбцов
-    print("  " + "---" * board_size)
+    lines = ["", "   " + " ".join([str(i) for i in range(board_size)])]  # Номера столбцов
+    lines.append("  " + "---" * board_size)
     for r_idx, row in enumerate(board):
         display_row = []
         for char in row:
             display_row.append(char if char != ' ' else '_')  # Заменяем пробелы на '_' для лучшей видимости
-        print(f"{r_idx} | " + " ".join(display_row) + " |")
-    print("  " + "---" * board_size)
+        lines.append(f"{r_idx} | " + " ".join(display_row) + " |")
+    lines.append("  " + "---" * board_size)
+    return lines
+
+
+def display_board(board):
+    """Отображает игровое поле в консоли."""
+    sys.stdout.write("\n".join(format_board(board)) + "\n")
 
 
 def get_player_move_input(player_name, board_size):
@@ -99,12 +151,106 @@ def display_message(message):
     print(message)
 
 
+def format_scores(scores):
+    """Возвращает строки таблицы очков (первая строка пустая)."""
+    lines = ["", "--- Текущие очки ---"]
+    for player_id, data in scores.items():
+        lines.append(f"{data['name']}: {data['score']} очков")
+    lines.append("--------------------")
+    return lines
+
+
 def display_scores(scores):
     """Отображает текущие очки игроков."""
-    print("\n--- Текущие очки ---")
-    for player_id, data in scores.items():
-        print(f"{data['name']}: {data['score']} очков")
-    print("--------------------")
+    sys.stdout.write("\n".join(format_scores(scores)) + "\n")
+
+
+class TerminalRenderer:
+    """
+    Отрисовка поля и очков с минимальной задержкой.
+    Кадр (поле и очки) закрепляется в верхней части экрана, а сообщения и ввод
+    прокручиваются под ним (область прокрутки терминала). Каждый кадр собирается
+    в одну строку и выводится одной записью; после первого кадра перерисовываются
+    только изменившиеся клетки и строки очков.
+    Если терминал не понимает ANSI (старая консоль Windows), кадр каждый раз
+    выводится целиком после очистки экрана. ansi задает это явно
+    (None - определить по консоли, см. ansi_supported).
+    При изменении высоты терминала кадр перерисовывается целиком.
+    """
+
+    def __init__(self, stream=None, ansi=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.ansi = ansi if ansi is not None else ansi_supported()
+        self._board = None  # Копия поля из последнего кадра
+        self._score_lines = None
+        self._pinned = False  # Закреплен ли кадр областью прокрутки
+        self._terminal_height = None  # Высота терминала, для которой задана область прокрутки
+
+    def render(self, board, scores):
+        """Рисует поле и очки: целиком в первый раз, дальше - только изменения."""
+        score_lines = format_scores(scores)
+        if not self.ansi:
+            clear_screen()
+            self.stream.write("\n".join(format_board(board) + score_lines) + "\n")
+            self.stream.flush()
+            return
+
+        terminal_height = shutil.get_terminal_size().lines
+        if not self._pinned or self._board is None or len(board) != len(self._board) \
+                or len(score_lines) != len(self._score_lines) or terminal_height != self._terminal_height:
+            frame = self._full_frame(board, score_lines, terminal_height)
+        else:
+            frame = self._diff_frame(board, score_lines)
+
+        self._board = [row[:] for row in board]
+        self._score_lines = score_lines
+        if frame:
+            self.stream.write(frame)
+            self.stream.flush()
+
+    def invalidate(self):
+        """Требует полной перерисовки при следующем вызове render."""
+        self._board = None
+
+    def close(self):
+        """Снимает закрепление кадра: дальше вывод идет как обычно."""
+        if self._pinned:
+            self.stream.write(ANSI_RESET_SCROLL_REGION + f"\x1b[{shutil.get_terminal_size().lines};1H\n")
+            self.stream.flush()
+        self._pinned = False
+        self._board = None
+
+    def _full_frame(self, board, score_lines, terminal_height):
+        lines = format_board(board) + score_lines
+        frame_height = len(lines)
+        self._terminal_height = terminal_height
+
+        parts = [ANSI_RESET_SCROLL_REGION, ANSI_CLEAR, "\n".join(lines), "\n"]
+        # Если под кадром есть место, закрепляем кадр - прокручивается только область ниже него
+        self._pinned = terminal_height > frame_height + 2
+        if self._pinned:
+            parts.append(f"\x1b[{frame_height + 1};{terminal_height}r\x1b[{frame_height + 1};1H")
+        return "".join(parts)
+
+    def _diff_frame(self, board, score_lines):
+        parts = []
+        # Клетка (r, c) находится в строке 4 + r кадра (нумерация терминала с 1)
+        for r, row in enumerate(board):
+            column_offset = len(f"{r} | ") + 1
+            for c, char in enumerate(row):
+                if char != self._board[r][c]:
+                    parts.append(f"\x1b[{4 + r};{column_offset + 2 * c}H{char if char != ' ' else '_'}")
+
+        # Поле занимает len(board) + 4 строки (пустая, номера столбцов, две рамки)
+        score_top = len(board) + 4 + 1
+        for i, line in enumerate(score_lines):
+            if line != self._score_lines[i]:
+                parts.append(f"\x1b[{score_top + i};1H{ANSI_CLEAR_LINE}{line}")
+
+        if not parts:
+            return ""
+        # Курсор возвращается туда, где пользователь вводит ход
+        return ANSI_SAVE_CURSOR + "".join(parts) + ANSI_RESTORE_CURSOR
 
 
 def ask_to_play_again():